@@ -1,12 +1,115 @@
 import pwnagotchi.plugins as plugins
+import copy
+import fnmatch
+import heapq
+import io
+import json
 import logging
+import multiprocessing
 import os
+import re
+import shutil
+import signal
+import stat
 import subprocess
+import sys
 import time
 import tarfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import threading
 
+# Output buffer for the in-process tarfile writer, large enough that a
+# 100 MB archive costs only a dozen write(2) calls
+WRITE_BUFFER_SIZE = 8 * 1024 * 1024
+
+# Backup items that may appear or disappear while the plugin is running
+VOLATILE_ITEMS = frozenset({
+    '/home/pi/.wpa_sec_uploads',
+    '/home/pi/handshakes',
+    '/root/peers',
+})
+
+# Backup items whose content is already entropy-dense (captured frames)
+INCOMPRESSIBLE_ITEMS = frozenset({
+    '/home/pi/handshakes',
+})
+
+# <hostname>_<part>[_incr]_<timestamp>.tar[.gz|.zst]; all parts of one run share a timestamp
+BACKUP_NAME_RE = re.compile(r'^(.+)_(backup|config|handshakes)(_incr)?_(\d{8}_\d{6})\.tar(\.gz|\.zst)?$')
+
+# Archive suffix for each compressor option value
+COMPRESSOR_SUFFIXES = {
+    'none': '.tar',
+    'gzip': '.tar.gz',
+    'zstd': '.tar.zst',
+}
+BACKUP_SUFFIXES = tuple(COMPRESSOR_SUFFIXES.values())
+
+# mtime/size of every file in the last full backup, kept in backup_path
+MANIFEST_NAME = '.manifest.json'
+
+# Shortest time between timer backups, guards against a zero or tiny interval_hours
+MIN_INTERVAL_SECONDS = 60
+
+# Longest a backup process may run before it is considered hung and killed
+BACKUP_TIMEOUT_SECONDS = 3600
+
+
+def fadvise(fd, advice):
+    """posix_fadvise() the whole file, a no-op where it is unsupported"""
+    try:
+        os.posix_fadvise(fd, 0, 0, getattr(os, advice))
+    except (AttributeError, OSError):
+        pass
+
+
+class SendfileTarFile(tarfile.TarFile):
+    """Uncompressed TarFile that copies regular file data with os.sendfile
+
+    File contents go from the page cache straight to the archive without
+    passing through Python. Only usable when the archive is written to a
+    real file descriptor, i.e. not through a compressor.
+    """
+
+    def addfile(self, tarinfo, fileobj=None):
+        if fileobj is None or not tarinfo.isreg() or tarinfo.size == 0:
+            return super().addfile(tarinfo, fileobj)
+
+        self._check("awx")
+        tarinfo = copy.copy(tarinfo)
+
+        header = tarinfo.tobuf(self.format, self.encoding, self.errors)
+        self.fileobj.write(header)
+        self.offset += len(header)
+
+        # Buffered header bytes must hit the fd before sendfile appends to it
+        self.fileobj.flush()
+        out_fd = self.fileobj.fileno()
+        in_fd = fileobj.fileno()
+        sent = 0
+        while sent < tarinfo.size:
+            n = os.sendfile(out_fd, in_fd, sent, tarinfo.size - sent)
+            if n == 0:
+                raise OSError("unexpected end of data")
+            sent += n
+
+        blocks, remainder = divmod(tarinfo.size, tarfile.BLOCKSIZE)
+        if remainder > 0:
+            self.fileobj.write(tarfile.NUL * (tarfile.BLOCKSIZE - remainder))
+            blocks += 1
+        self.offset += blocks * tarfile.BLOCKSIZE
+
+        self.members.append(tarinfo)
+
+
+def backup_process(plugin, force):
+    """Entry point of the backup child process, exit status 0 on success"""
+    # Own process group, so a timeout also stops the tar and compressor children
+    os.setsid()
+    sys.exit(0 if plugin._run_backup(force) else 1)
+
+
 class SimpleBackup(plugins.Plugin):
     __author__ = 'bl4k7en'
     __version__ = '1.1'
@@ -15,10 +118,11 @@ class SimpleBackup(plugins.Plugin):
 
     def __init__(self):
         self.ready = False
-        self.running = False
+        self._run_lock = threading.Lock()
         self.last_backup = 0
+        self._last_completed = 0
         self.timer_thread = None
-        self.stop_timer = False
+        self._stop_event = threading.Event()
 
     def on_loaded(self):
         """Initialize plugin on load"""
@@ -28,8 +132,23 @@ class SimpleBackup(plugins.Plugin):
         self.options.setdefault('backup_path', '/home/pi/backups')
         self.options.setdefault('max_backups', 5)
         self.options.setdefault('compress', True)
+        self.options.setdefault('compressor', 'gzip' if self.options['compress'] else 'none')
+        self.options.setdefault('compresslevel', 6)
+        self.options.setdefault('incompressible_globs', ['*.pcap', '*.pcapng', '*.gz', '*.jpg'])
+        self.options.setdefault('full_backup_days', 7)
         self.options.setdefault('backup_on_boot', True)
         
+        # Prefer the C-coded tar binary and parallel gzip when available
+        self._tar_bin = shutil.which('tar')
+        self._pigz_bin = shutil.which('pigz')
+        self._compressor = self.options['compressor']
+        if self._compressor not in COMPRESSOR_SUFFIXES:
+            logging.warning(f"[BACKUP] Unknown compressor {self._compressor}, using gzip")
+            self._compressor = 'gzip'
+        if self._compressor == 'zstd' and not shutil.which('zstd'):
+            logging.warning("[BACKUP] zstd not found, using gzip")
+            self._compressor = 'gzip'
+        
         # Files/directories to backup
         self.backup_items = [
             '/etc/pwnagotchi/config.toml',
@@ -50,6 +169,8 @@ class SimpleBackup(plugins.Plugin):
             '/root/peers',
             '/usr/local/share/pwnagotchi/custom-plugins'
         ]
+        self._cache_backup_items()
+        self._hostname = os.uname().nodename
         
         self.ready = True
         logging.info("[BACKUP] Plugin loaded successfully")
@@ -81,24 +202,367 @@ class SimpleBackup(plugins.Plugin):
             logging.error(f"[BACKUP] Failed to create backup directory: {e}")
             return False
 
+    def _exists(self, item):
+        """Check existence with a single lstat"""
+        try:
+            os.lstat(item)
+        except OSError:
+            logging.debug(f"[BACKUP] Skipping non-existent: {item}")
+            return False
+        return True
+
+    def _cache_backup_items(self):
+        """Remember non-volatile items present at load, so they skip the existence check"""
+        self._static_items = {
+            item for item in self.backup_items
+            if item not in VOLATILE_ITEMS and self._exists(item)
+        }
+
     def _get_existing_files(self):
-        """Get list of files/dirs that actually exist"""
-        existing = []
-        for item in self.backup_items:
-            if os.path.exists(item):
-                existing.append(item)
+        """Get list of files/dirs that actually exist
+
+        Cached items are not re-checked here. If one was removed since load,
+        the lstat pass in _changed_since/_scan_items drops it. Items missing at
+        load are checked on every backup so they are picked up once created.
+        """
+        return [
+            item for item in self.backup_items
+            if item in self._static_items or self._exists(item)
+        ]
+
+    def _compress_command(self):
+        """Command line of the external compressor"""
+        if self._compressor == 'zstd':
+            # Level 3 matches gzip -6 ratio at several times the speed, -T0 uses all cores
+            return ['zstd', '-T0', '-3', '-q']
+        level = f"-{self.options['compresslevel']}"
+        if self._pigz_bin:
+            # Spread DEFLATE over all cores
+            return ['pigz', level, '-p', str(os.cpu_count() or 1)]
+        return ['gzip', level]
+
+    def _split_incompressible(self, files_to_backup):
+        """Split items into (compressible, incompressible) lists"""
+        globs = self.options['incompressible_globs']
+        compressible, incompressible = [], []
+        for item in files_to_backup:
+            name = os.path.basename(item)
+            if item in INCOMPRESSIBLE_ITEMS or any(fnmatch.fnmatch(name, g) for g in globs):
+                incompressible.append(item)
             else:
-                logging.debug(f"[BACKUP] Skipping non-existent: {item}")
-        return existing
+                compressible.append(item)
+        return compressible, incompressible
+
+    def _incompressible_files(self, scan):
+        """Files found by a scan whose names match incompressible_globs"""
+        globs = self.options['incompressible_globs']
+        if not globs:
+            return []
+        return [
+            path for path in scan
+            if any(fnmatch.fnmatch(os.path.basename(path), g) for g in globs)
+            and not os.path.isdir(path)
+        ]
+
+    def _archive_with_tar(self, files_to_backup, backup_file, compress, recursive=True):
+        """Create archive with the external tar binary"""
+        argv = [self._tar_bin, '-c', '-f', backup_file, '-C', '/']
+        if compress:
+            argv += ['-I', ' '.join(self._compress_command())]
+        if not recursive:
+            argv.append('--no-recursion')
+        # Read names from stdin, the expanded list of an incremental may be long
+        argv += ['--null', '-T', '-']
+        # Files removed after the scan are warnings, like tarfile's per-item handling
+        argv.append('--ignore-failed-read')
+        # Paths relative to / give the same member names as arcname=item
+        names = b''.join(os.fsencode(os.path.relpath(item, '/')) + b'\0' for item in files_to_backup)
+
+        result = subprocess.run(argv, input=names, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        stderr = result.stderr.decode(errors='replace').strip()
+        # Exit status 1 only means some files changed while being read
+        if result.returncode in (0, 1):
+            if stderr:
+                logging.warning(f"[BACKUP] tar: {stderr}")
+        else:
+            raise RuntimeError(f"tar exited with status {result.returncode}: {stderr}")
+
+    def _add_file(self, tar, path):
+        """Add a regular file to tar without keeping it in the page cache"""
+        with open(path, 'rb') as f:
+            # fstat on the open file instead of a second lstat by path
+            tarinfo = tar.gettarinfo(arcname=path, fileobj=f)
+            tar.addfile(tarinfo, f)
+            # Backed up files are not read again, leave the cache to pwnagotchi
+            fadvise(f.fileno(), 'POSIX_FADV_DONTNEED')
+
+    def _add_item(self, tar, item, recursive=True):
+        """Add item to tar, walking directories with os.scandir
+
+        Entries are added in directory order. Unlike tar.add(recursive=True)
+        there is no listdir() and sorted() copy of each directory.
+        """
+        mode = os.lstat(item).st_mode
+        if stat.S_ISREG(mode):
+            self._add_file(tar, item)
+            return
+        tar.add(item, arcname=item, recursive=False)
+        if not recursive or not stat.S_ISDIR(mode):
+            return
+
+        # Locals for the per-entry loop, it runs for every captured handshake
+        add, add_file = tar.add, self._add_file
+        stack = [item]
+        push = stack.append
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        path = entry.path
+                        try:
+                            if entry.is_file(follow_symlinks=False):
+                                add_file(tar, path)
+                            else:
+                                add(path, arcname=path, recursive=False)
+                                if entry.is_dir(follow_symlinks=False):
+                                    push(path)
+                        except FileNotFoundError:
+                            # Removed after listing, skip it like tar does
+                            logging.debug(f"[BACKUP] Skipping removed: {path}")
+            except FileNotFoundError:
+                continue
+
+    def _archive_with_tarfile(self, files_to_backup, backup_file, compress, recursive=True):
+        """Create archive in-process with tarfile (fallback without tar binary)"""
+        # Coalesce tarfile's small header/block writes into large ones
+        raw = open(backup_file, 'wb', buffering=0)
+        fadvise(raw.fileno(), 'POSIX_FADV_SEQUENTIAL')
+        buf = io.BufferedWriter(raw, buffer_size=WRITE_BUFFER_SIZE)
+        compressor = None
+        try:
+            if compress and (self._compressor == 'zstd' or self._pigz_bin):
+                # tarfile writes a plain tar stream, zstd/pigz compress it in parallel
+                compressor = subprocess.Popen(
+                    self._compress_command(),
+                    stdin=subprocess.PIPE, stdout=raw, stderr=subprocess.PIPE
+                )
+                tar = tarfile.open(fileobj=compressor.stdin, mode='w|')
+            elif compress:
+                tar = tarfile.open(fileobj=buf, mode='w:gz', compresslevel=self.options['compresslevel'])
+            elif hasattr(os, 'sendfile'):
+                # gzip needs the bytes in user space, plain tar does not
+                tar = SendfileTarFile.open(fileobj=buf, mode='w')
+            else:
+                tar = tarfile.open(fileobj=buf, mode='w')
+            # Only build the per-item debug message when it will be emitted;
+            # an incremental passes every changed file as an item
+            add_item, logger = self._add_item, logging.getLogger()
+            debug_on = logger.isEnabledFor(logging.DEBUG)
+            with tar:
+                for item in files_to_backup:
+                    try:
+                        add_item(tar, item, recursive)
+                        if debug_on:
+                            logger.debug("[BACKUP] Added: %s", item)
+                    except Exception as e:
+                        logging.warning(f"[BACKUP] Failed to add {item}: {e}")
+        finally:
+            if compressor:
+                _, stderr = compressor.communicate()
+            buf.close()
+
+        if compressor and compressor.returncode != 0:
+            stderr = stderr.decode(errors='replace').strip()
+            name = compressor.args[0]
+            raise RuntimeError(f"{name} exited with status {compressor.returncode}: {stderr}")
+
+    def _write_archive(self, items, tmp_file, compress, recursive):
+        """Create one archive and flush it to disk"""
+        if self._tar_bin:
+            self._archive_with_tar(items, tmp_file, compress, recursive)
+        else:
+            self._archive_with_tarfile(items, tmp_file, compress, recursive)
+        self._sync_archive(tmp_file)
+
+    def _sync_archive(self, path):
+        """Flush a finished archive to disk and drop it from the page cache"""
+        with open(path, 'rb') as f:
+            os.fsync(f.fileno())
+            fadvise(f.fileno(), 'POSIX_FADV_DONTNEED')
+
+    def _sync_dir(self, path):
+        """Persist renames in a directory"""
+        fd = os.open(path, os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
 
-    def _create_backup(self):
-        """Create the actual backup file"""
-        if self.running:
+    def _changed_since(self, items, since):
+        """Check if any item or anything below it was modified after since"""
+        stack = []
+        for item in items:
+            try:
+                st = os.lstat(item)
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                logging.warning(f"[BACKUP] Cannot stat {item}: {e}")
+                continue
+            if st.st_mtime > since:
+                return True
+            if stat.S_ISDIR(st.st_mode):
+                stack.append(item)
+
+        while stack:
+            path = stack.pop()
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.stat(follow_symlinks=False).st_mtime > since:
+                                return True
+                        except FileNotFoundError:
+                            # Removed after listing, e.g. by a handshake cleanup plugin
+                            continue
+                        except OSError as e:
+                            # Unreadable entry, e.g. a failing SD card, check the rest
+                            logging.warning(f"[BACKUP] Cannot stat {entry.path}: {e}")
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                logging.warning(f"[BACKUP] Cannot read {path}: {e}")
+                continue
+        return False
+
+    def _scan_items(self, items):
+        """Map items and everything below them to [mtime, size]"""
+        scan = {}
+        stack = []
+        for item in items:
+            try:
+                st = os.lstat(item)
+            except FileNotFoundError:
+                logging.debug(f"[BACKUP] Skipping removed: {item}")
+                continue
+            except OSError as e:
+                logging.warning(f"[BACKUP] Cannot stat {item}: {e}")
+                continue
+            scan[item] = [st.st_mtime, st.st_size]
+            if stat.S_ISDIR(st.st_mode):
+                stack.append(item)
+
+        push = stack.append
+        while stack:
+            path = stack.pop()
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        try:
+                            st = entry.stat(follow_symlinks=False)
+                        except FileNotFoundError:
+                            # Removed after listing, e.g. by a handshake cleanup plugin
+                            continue
+                        except OSError as e:
+                            # Unreadable entry, e.g. a failing SD card, back up the rest
+                            logging.warning(f"[BACKUP] Cannot stat {entry.path}: {e}")
+                            continue
+                        scan[entry.path] = [st.st_mtime, st.st_size]
+                        if entry.is_dir(follow_symlinks=False):
+                            push(entry.path)
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                logging.warning(f"[BACKUP] Cannot read {path}: {e}")
+                continue
+        return scan
+
+    def _load_manifest(self):
+        """Load the manifest of the last full backup if it can be built upon"""
+        backup_path = self.options['backup_path']
+        full_backup_days = self.options['full_backup_days']
+        if not full_backup_days:
+            return None
+        try:
+            with open(os.path.join(backup_path, MANIFEST_NAME)) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        try:
+            # Time for a new full, or the full backup is gone
+            if time.time() - manifest['created'] >= full_backup_days * 86400:
+                return None
+            if not all(os.path.exists(os.path.join(backup_path, name)) for name in manifest['archives']):
+                return None
+            if not isinstance(manifest['files'], dict):
+                return None
+        except (KeyError, TypeError):
+            # Valid JSON of the wrong shape, start over with a full backup
+            logging.warning("[BACKUP] Invalid manifest, creating full backup")
+            return None
+        return manifest
+
+    def _save_manifest(self, manifest):
+        """Write the manifest of a full backup"""
+        path = os.path.join(self.options['backup_path'], MANIFEST_NAME)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(manifest, f)
+        os.replace(path + '.tmp', path)
+
+    def _kill_group(self, pgid, sig):
+        """Signal every process of a backup process group"""
+        try:
+            os.killpg(pgid, sig)
+        except ProcessLookupError:
+            pass
+
+    def _create_backup(self, force=False):
+        """Run a backup in a child process and wait for it"""
+        # Boot timer, periodic loop and webhook may all fire at once
+        if not self._run_lock.acquire(blocking=False):
             logging.info("[BACKUP] Backup already running, skipping")
             return False
-
-        self.running = True
         
+        try:
+            started = time.time()
+            # Fork: the plugin is loaded from a file path, a spawned child could not import it.
+            # Only this thread blocks in join(), tarfile work never holds the pwnagotchi GIL
+            process = multiprocessing.get_context('fork').Process(
+                target=backup_process, args=(self, force), daemon=True
+            )
+            process.start()
+            process.join(BACKUP_TIMEOUT_SECONDS)
+            if process.is_alive():
+                # A hung child would otherwise hold the run lock forever. Kill its whole
+                # group, then the leftover .tmp files are removed by the next cleanup
+                logging.error(f"[BACKUP] Backup timed out after {BACKUP_TIMEOUT_SECONDS}s, terminating")
+                self._kill_group(process.pid, signal.SIGTERM)
+                process.join(10)
+                self._kill_group(process.pid, signal.SIGKILL)
+                # Still alive only if the timeout hit before setsid()
+                process.kill()
+                process.join()
+                return False
+            if process.exitcode != 0:
+                return False
+            
+            self.last_backup = time.time()
+            self._last_completed = started
+            return True
+        except Exception as e:
+            logging.error(f"[BACKUP] Backup failed: {e}")
+            return False
+        finally:
+            self._run_lock.release()
+
+    def _run_backup(self, force=False):
+        """Create the actual backup file, called in the backup process"""
+        backup_path = self.options['backup_path']
+        tmp_files = []
         try:
             # Ensure backup directory exists
             if not self._ensure_backup_dir():
@@ -110,54 +574,113 @@ class SimpleBackup(plugins.Plugin):
                 logging.error("[BACKUP] No files found to backup!")
                 return False
 
-            # Create backup filename with timestamp
+            # Nothing to do if no file changed since the last backup started
+            if not force and self._last_completed and \
+                    not self._changed_since(files_to_backup, self._last_completed):
+                logging.info("[BACKUP] No changes, skipping")
+                return True
+            started = time.time()
+
+            # Create backup filenames with timestamp
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            hostname = os.uname().nodename
+            hostname = self._hostname
             
-            if self.options['compress']:
-                backup_file = os.path.join(
-                    self.options['backup_path'],
-                    f"{hostname}_backup_{timestamp}.tar.gz"
-                )
-                compression = 'gz'
+            if self._compressor != 'none':
+                # Compression gains nothing on captures, store those uncompressed
+                compressible, incompressible = self._split_incompressible(files_to_backup)
+                parts = [
+                    ('config', compressible, True),
+                    ('handshakes', incompressible, False),
+                ]
             else:
+                parts = [('backup', files_to_backup, False)]
+
+            # Between full backups only store what changed since the last full
+            manifest = self._load_manifest()
+            incremental = manifest is not None
+            scan = {}
+
+            backup_files = []
+            jobs = []
+            for part, items, compress in parts:
+                if not items:
+                    continue
+                part_scan = self._scan_items(items)
+                scan.update(part_scan)
+                # Drop items removed since load, tar would fail on them
+                items = [item for item in items if item in part_scan]
+                if not items:
+                    continue
+                recursive = not incremental
+
+                # Matching files inside compressible items go to the uncompressed part,
+                # this part is then archived from the explicit list of what is left
+                moved = self._incompressible_files(part_scan) if compress else []
+                if moved:
+                    incompressible.extend(moved)
+                    moved = set(moved)
+                    part_scan = {path: info for path, info in part_scan.items() if path not in moved}
+                    items = list(part_scan)
+                    recursive = False
+
+                if incremental:
+                    files = manifest['files']
+                    items = [path for path, info in part_scan.items() if files.get(path) != info]
+                    if not items:
+                        continue
+                    part += '_incr'
+
+                suffix = COMPRESSOR_SUFFIXES[self._compressor if compress else 'none']
                 backup_file = os.path.join(
-                    self.options['backup_path'],
-                    f"{hostname}_backup_{timestamp}.tar"
+                    backup_path,
+                    f"{hostname}_{part}_{timestamp}{suffix}"
                 )
-                compression = ''
+                logging.info(f"[BACKUP] Creating backup: {backup_file}")
+                logging.info(f"[BACKUP] Backing up {len(items)} items...")
 
-            logging.info(f"[BACKUP] Creating backup: {backup_file}")
-            logging.info(f"[BACKUP] Backing up {len(files_to_backup)} items...")
+                # Create tar archive under a temporary name, a power loss
+                # must not leave a truncated archive that counts as a backup
+                tmp_file = backup_file + '.tmp'
+                tmp_files.append(tmp_file)
+                backup_files.append(backup_file)
+                jobs.append((items, tmp_file, compress, recursive))
 
-            # Create tar archive
-            with tarfile.open(backup_file, f'w:{compression}') as tar:
-                for item in files_to_backup:
-                    try:
-                        # Use arcname to preserve directory structure
-                        tar.add(item, arcname=item)
-                        logging.debug(f"[BACKUP] Added: {item}")
-                    except Exception as e:
-                        logging.warning(f"[BACKUP] Failed to add {item}: {e}")
+            # Parts are independent, compress one while reading the other from SD
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                futures = [executor.submit(self._write_archive, *job) for job in jobs]
+                for future in futures:
+                    future.result()
 
-            # Verify backup was created
-            if os.path.exists(backup_file):
-                size_mb = os.path.getsize(backup_file) / (1024 * 1024)
-                logging.info(f"[BACKUP] Backup successful! Size: {size_mb:.2f} MB")
-                self.last_backup = time.time()
-                
-                # Cleanup old backups
-                self._cleanup_old_backups()
+            if not backup_files:
+                logging.info("[BACKUP] No changes since last full backup, skipping")
                 return True
-            else:
-                logging.error("[BACKUP] Backup file was not created!")
-                return False
+
+            size_mb = sum(os.path.getsize(f) for f in tmp_files) / (1024 * 1024)
+            for tmp_file, backup_file in zip(tmp_files, backup_files):
+                os.replace(tmp_file, backup_file)
+            self._sync_dir(backup_path)
+            tmp_files = []
+            logging.info(f"[BACKUP] Backup successful! Size: {size_mb:.2f} MB")
+            if not incremental:
+                self._save_manifest({
+                    'created': started,
+                    'archives': [os.path.basename(f) for f in backup_files],
+                    'files': scan,
+                })
+            
+            # Cleanup old backups
+            self._cleanup_old_backups()
+            return True
 
         except Exception as e:
             logging.error(f"[BACKUP] Backup failed: {e}")
             return False
         finally:
-            self.running = False
+            for tmp_file in tmp_files:
+                try:
+                    os.remove(tmp_file)
+                except OSError:
+                    pass
 
     def _cleanup_old_backups(self):
         """Remove old backups if we exceed max_backups - keeps newest first"""
@@ -165,68 +688,94 @@ class SimpleBackup(plugins.Plugin):
             backup_path = self.options['backup_path']
             max_backups = self.options['max_backups']
             
-            # Get all backup files
-            backup_files = []
-            for filename in os.listdir(backup_path):
-                if filename.endswith('.tar.gz') or filename.endswith('.tar'):
-                    filepath = os.path.join(backup_path, filename)
-                    backup_files.append((filepath, os.path.getmtime(filepath)))
-            
-            # Sort by modification time (NEWEST first)
-            backup_files.sort(key=lambda x: x[1], reverse=True)
+            # Group backup files by run, archives of one run share host and timestamp
+            tmp_suffixes = tuple(suffix + '.tmp' for suffix in BACKUP_SUFFIXES)
+            backups = {}
+            with os.scandir(backup_path) as entries:
+                for entry in entries:
+                    if entry.name.endswith(tmp_suffixes) and entry.is_file():
+                        # Left behind by a backup that was interrupted
+                        try:
+                            os.remove(entry.path)
+                            logging.info(f"[BACKUP] Deleted incomplete backup: {entry.name}")
+                        except Exception as e:
+                            logging.error(f"[BACKUP] Failed to delete {entry.path}: {e}")
+                        continue
+                    if not (entry.name.endswith(BACKUP_SUFFIXES) and entry.is_file()):
+                        continue
+                    match = BACKUP_NAME_RE.match(entry.name)
+                    key = (match.group(1), match.group(4)) if match else entry.name
+                    incremental = bool(match and match.group(3))
+                    paths, mtime, _ = backups.get(key, ([], 0, incremental))
+                    paths.append(entry.path)
+                    backups[key] = (paths, max(mtime, entry.stat().st_mtime), incremental)
             
             # Delete oldest if we have too many (keep only the newest max_backups)
-            if len(backup_files) > max_backups:
-                to_delete = len(backup_files) - max_backups
-                logging.info(f"[BACKUP] Keeping {max_backups} newest backups, deleting {to_delete} old one(s)")
+            if len(backups) > max_backups:
+                # Only the newest max_backups need ordering (NEWEST first)
+                newest = heapq.nlargest(max_backups, backups.items(), key=lambda x: x[1][1])
+                keep = [backup for _, backup in newest]
+                kept_keys = {key for key, _ in newest}
+                old = [backup for key, backup in backups.items() if key not in kept_keys]
                 
-                # Delete from the end of the list (oldest files)
-                for i in range(max_backups, len(backup_files)):
-                    filepath = backup_files[i][0]
-                    try:
-                        os.remove(filepath)
-                        logging.info(f"[BACKUP] Deleted old backup: {os.path.basename(filepath)}")
-                    except Exception as e:
-                        logging.error(f"[BACKUP] Failed to delete {filepath}: {e}")
+                # An incremental is useless without the full backup it is based on
+                if keep and keep[-1][2]:
+                    fulls = [backup for backup in old if not backup[2]]
+                    if fulls:
+                        base = max(fulls, key=lambda x: x[1])
+                        old.remove(base)
+                        keep.append(base)
+                
+                if old:
+                    logging.info(f"[BACKUP] Keeping {len(keep)} newest backups, deleting {len(old)} old one(s)")
+                
+                # Delete the oldest runs
+                for paths, _, _ in old:
+                    for filepath in paths:
+                        try:
+                            os.remove(filepath)
+                            logging.info(f"[BACKUP] Deleted old backup: {os.path.basename(filepath)}")
+                        except Exception as e:
+                            logging.error(f"[BACKUP] Failed to delete {filepath}: {e}")
                         
         except Exception as e:
             logging.error(f"[BACKUP] Cleanup error: {e}")
 
-    def _should_backup(self):
-        """Check if backup is due based on interval"""
-        if self.last_backup == 0:
-            return False  # Don't backup immediately on startup
-        
-        interval_seconds = self.options['interval_hours'] * 3600
-        elapsed = time.time() - self.last_backup
-        
-        return elapsed >= interval_seconds
+    def _seconds_until_backup(self):
+        """Seconds left until the next backup is due based on interval"""
+        interval_seconds = max(self.options['interval_hours'] * 3600, MIN_INTERVAL_SECONDS)
+        return self.last_backup + interval_seconds - time.time()
     
     def _start_backup_timer(self):
         """Start background timer thread for regular backups"""
         def backup_loop():
             logging.info("[BACKUP] Background timer started")
             # Wait 60 seconds before first check to let system stabilize
-            time.sleep(60)
+            if self._stop_event.wait(60):
+                return
             
-            while not self.stop_timer:
+            while not self._stop_event.is_set():
                 try:
-                    if self._should_backup():
-                        logging.info("[BACKUP] Timer triggered backup")
-                        self._create_backup()
+                    # Sleep until the backup is due, woken early only by on_unload
+                    remaining = self._seconds_until_backup()
+                    if remaining > 0:
+                        self._stop_event.wait(max(remaining, 1.0))
+                        continue
                     
-                    # Check every 5 minutes if backup is due
-                    time.sleep(300)
+                    logging.info("[BACKUP] Timer triggered backup")
+                    if not self._create_backup():
+                        # Retry in 5 minutes instead of spinning on a failing backup
+                        self._stop_event.wait(300)
                 except Exception as e:
                     logging.error(f"[BACKUP] Timer error: {e}")
-                    time.sleep(60)
+                    self._stop_event.wait(60)
         
         self.timer_thread = threading.Thread(target=backup_loop, daemon=True)
         self.timer_thread.start()
     
     def on_unload(self, ui):
         """Stop timer when plugin is unloaded"""
-        self.stop_timer = True
+        self._stop_event.set()
         if self.timer_thread:
             self.timer_thread.join(timeout=5)
 
@@ -234,5 +783,6 @@ class SimpleBackup(plugins.Plugin):
         """Manual backup trigger via webhook"""
         if path == 'backup':
             logging.info("[BACKUP] Manual backup triggered via webhook")
-            success = self._create_backup()
+            force = request.args.get('force') == '1'
+            success = self._create_backup(force=force)
             return "Backup completed successfully!" if success else "Backup failed!"